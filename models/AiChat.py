@@ -2,25 +2,42 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 
-import pandas as pd
-from openai import OpenAI
+from llm_backends import LLMBackend, backend_from_env
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ─────────────────────────────────────────────────────────────
 # Config
 # ─────────────────────────────────────────────────────────────
-API_KEY = os.getenv("OPENAI_API_KEY").strip()
-if not API_KEY:
-    raise RuntimeError("Set OPENAI_API_KEY environment variable.")
 MODEL = os.getenv("OPENAI_MODEL", "gpt-5")  # e.g. "gpt-4.1-mini" if needed
-client = OpenAI(api_key=API_KEY)
+
+# The LLM backend and the dataset are created on first use (see get_backend/get_data),
+# and pandas/openai are only imported then, so importing this module stays cheap.
+_backend: Optional[LLMBackend] = None
+_data: Optional[pd.DataFrame] = None
+
+
+def set_backend(backend: Optional[LLMBackend]) -> None:
+    global _backend
+    _backend = backend
+
+
+def get_backend() -> LLMBackend:
+    global _backend
+    if _backend is None:
+        _backend = backend_from_env()
+    return _backend
 
 # ─────────────────────────────────────────────────────────────
 # Mock Water Quality Data (Amsterdam swimming spots – sample)
 # You can replace/extend this with your real columns later.
 # ─────────────────────────────────────────────────────────────
 def load_mock_data() -> pd.DataFrame:
+    import pandas as pd
+
     data = [
         # date, location, e_coli_cfu, cyanobacteria_risk, temperature_c,
         # oxygen_mg_l, nutrients_mg_l, clarity_cm, ph, status, advisory
@@ -74,6 +91,13 @@ def load_mock_data() -> pd.DataFrame:
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     return df
 
+
+def get_data() -> pd.DataFrame:
+    global _data
+    if _data is None:
+        _data = load_mock_data()
+    return _data
+
 # ─────────────────────────────────────────────────────────────
 # Optional manual filter (you can call it directly)
 # ─────────────────────────────────────────────────────────────
@@ -107,15 +131,14 @@ def llm_suggest_filters(question: str, df_columns: list[str]) -> Dict[str, Any]:
         '{"location":"Sloterplas","year":2025}'
     )
 
-    resp = client.chat.completions.create(
-        model=MODEL,
-        temperature=1,
-        messages=[
+    text = get_backend().complete(
+        [
             {"role": "system", "content": system},
             {"role": "user", "content": msg_user},
         ],
-    )
-    text = resp.choices[0].message.content.strip()
+        model=MODEL,
+        temperature=1,
+    ).text
     try:
         data = json.loads(text)
     except Exception:
@@ -150,20 +173,21 @@ def build_prompt(user_question: str, rows: pd.DataFrame, max_rows: int = 20) ->
 # Ask model for the final answer
 # ─────────────────────────────────────────────────────────────
 def ask_llm(prompt: str) -> str:
-    resp = client.chat.completions.create(
-        model=MODEL,
-        temperature=1,
-        messages=[
+    return get_backend().complete(
+        [
             {"role": "system", "content": "Be concise, factual, and cite specific dates/locations from the rows when possible."},
             {"role": "user", "content": prompt},
         ],
-    )
-    return resp.choices[0].message.content.strip()
+        model=MODEL,
+        temperature=1,
+    ).text
 
 # ─────────────────────────────────────────────────────────────
 # High-level: answer a question with LLM-derived filters
 # ─────────────────────────────────────────────────────────────
-def answer_question(question: str, df: pd.DataFrame, max_rows: int = 20) -> str:
+def answer_question(question: str, df: Optional[pd.DataFrame] = None, max_rows: int = 20) -> str:
+    if df is None:
+        df = get_data()
     inferred = llm_suggest_filters(question, df.columns.tolist())
     # Try inferred filters first; if empty, give the model more to look at
     df_inferred = filter_rows(df, location=inferred["location"], year=inferred["year"])
@@ -175,7 +199,7 @@ def answer_question(question: str, df: pd.DataFrame, max_rows: int = 20) -> str:
 # CLI Loop
 # ─────────────────────────────────────────────────────────────
 def main():
-    df = load_mock_data()
+    df = get_data()
     print("Water Quality AI Bot (mock data)\nType your question, or 'exit' to quit.")
     print("Examples:")
     print(" - Compare the swimming status and advisories between Vinkeveense Plassen and Sloterplas in July 2025.")
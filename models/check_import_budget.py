@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+CHAT_DIR = ROOT / "models"
+SCRIPTS_DIR = ROOT / "tutorials" / "scripts"
+
+HEAVY = ["pandas", "numpy", "openai", "matplotlib", "ipywidgets", "plotly", "IPython"]
+
+# ─────────────────────────────────────────────────────────────
+# Budgets: (directory, module) -> max import seconds + stacks it must not load
+# Chat entry points stay stdlib-only; plotting modules may load pandas/numpy
+# (their data layer) but not the plotting/widget/LLM stacks.
+# ─────────────────────────────────────────────────────────────
+BUDGETS = [
+    {"dir": CHAT_DIR, "module": "llm_backends", "max_s": 0.15, "forbid": HEAVY},
+    {"dir": CHAT_DIR, "module": "AiChat", "max_s": 0.15, "forbid": HEAVY},
+    {"dir": CHAT_DIR, "module": "loadgen", "max_s": 0.15, "forbid": HEAVY},
+    {"dir": SCRIPTS_DIR, "module": "station_timeseries_viewers", "max_s": 1.5,
+     "forbid": ["openai", "matplotlib", "ipywidgets", "plotly", "IPython"]},
+    {"dir": SCRIPTS_DIR, "module": "station_timeseries_viewers_plotly", "max_s": 1.5,
+     "forbid": ["openai", "matplotlib", "ipywidgets", "plotly", "IPython"]},
+]
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+__import__(sys.argv[2])
+dt = time.perf_counter() - t0
+print(json.dumps({"seconds": dt, "loaded": sorted({m.split('.')[0] for m in sys.modules})}))
+"""
+
+# ─────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────
+def measure(directory: Path, module: str, repeat: int = 3) -> Dict:
+    """Import `module` in fresh interpreters; return the best time and the top-level modules loaded."""
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE, str(directory), module],
+            capture_output=True, text=True, check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or r["seconds"] < best["seconds"]:
+            best = r
+    return best
+
+
+def check(budgets: List[Dict], repeat: int = 3) -> bool:
+    ok = True
+    for b in budgets:
+        r = measure(b["dir"], b["module"], repeat)
+        leaked = sorted(set(b["forbid"]) & set(r["loaded"]))
+        passed = r["seconds"] <= b["max_s"] and not leaked
+        ok &= passed
+        status = "ok  " if passed else "FAIL"
+        extra = f"  loaded: {', '.join(leaked)}" if leaked else ""
+        print(f"{status} {b['module']:<36} {r['seconds'] * 1000:7.1f} ms (budget {b['max_s'] * 1000:.0f} ms){extra}")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check import time and lazily-loaded stacks of the chat and viewer modules.")
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module; the best run counts")
+    args = ap.parse_args()
+    sys.exit(0 if check(BUDGETS, args.repeat) else 1)
+
+
+if __name__ == "__main__":
+    main()
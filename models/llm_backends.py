@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+Messages = List[Dict[str, str]]
+
+# ─────────────────────────────────────────────────────────────
+# Response + backend interface
+# ─────────────────────────────────────────────────────────────
+@dataclass
+class LLMResponse:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMBackend(ABC):
+    """Anything that turns chat messages into a completion."""
+
+    @abstractmethod
+    def complete(self, messages: Messages, model: str, temperature: float = 1) -> LLMResponse:
+        ...
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough rule of thumb (~4 characters per token) for backends without usage info
+    return max(1, len(text) // 4)
+
+
+def request_key(messages: Messages, model: str, temperature: float) -> str:
+    payload = json.dumps({"model": model, "temperature": temperature, "messages": messages}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ─────────────────────────────────────────────────────────────
+# OpenAI (network)
+# ─────────────────────────────────────────────────────────────
+class OpenAIBackend(LLMBackend):
+    def __init__(self, api_key: Optional[str] = None):
+        api_key = (api_key or os.getenv("OPENAI_API_KEY") or "").strip()
+        if not api_key:
+            raise RuntimeError("Set OPENAI_API_KEY environment variable.")
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key)
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1) -> LLMResponse:
+        resp = self.client.chat.completions.create(model=model, temperature=temperature, messages=messages)
+        usage = getattr(resp, "usage", None)
+        return LLMResponse(
+            text=resp.choices[0].message.content.strip(),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+# ─────────────────────────────────────────────────────────────
+# Record / replay (offline, deterministic)
+# ─────────────────────────────────────────────────────────────
+class RecordingBackend(LLMBackend):
+    """Wraps another backend and appends every request/response to a JSONL file."""
+
+    def __init__(self, inner: LLMBackend, path: str | Path):
+        self.inner = inner
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1) -> LLMResponse:
+        t0 = time.perf_counter()
+        resp = self.inner.complete(messages, model, temperature)
+        latency_s = time.perf_counter() - t0
+        record = {
+            "key": request_key(messages, model, temperature),
+            "model": model,
+            "messages": messages,
+            "text": resp.text,
+            "prompt_tokens": resp.prompt_tokens,
+            "completion_tokens": resp.completion_tokens,
+            "latency_s": round(latency_s, 4),
+        }
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return resp
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Answers from a file written by RecordingBackend; unknown requests raise KeyError.
+    With replay_latency=True each answer is delayed by its recorded latency,
+    so load runs against recordings still show realistic latency percentiles.
+    """
+
+    def __init__(self, path: str | Path, replay_latency: bool = False):
+        self.replay_latency = replay_latency
+        self.records: Dict[str, LLMResponse] = {}
+        self.latencies: Dict[str, float] = {}
+        with Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                r = json.loads(line)
+                self.records[r["key"]] = LLMResponse(r["text"], r.get("prompt_tokens", 0), r.get("completion_tokens", 0))
+                self.latencies[r["key"]] = float(r.get("latency_s", 0.0))
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1) -> LLMResponse:
+        key = request_key(messages, model, temperature)
+        if key not in self.records:
+            raise KeyError(f"No recorded response for request {key[:12]} (model={model}).")
+        if self.replay_latency:
+            time.sleep(self.latencies[key])
+        return self.records[key]
+
+# ─────────────────────────────────────────────────────────────
+# Latency-simulating stub (no network, no recordings needed)
+# ─────────────────────────────────────────────────────────────
+def default_stub_responder(messages: Messages) -> str:
+    system = messages[0]["content"] if messages else ""
+    if "Extract filters" in system:
+        return '{"location": null, "year": null}'
+    return "Stub answer: no model was called."
+
+
+class StubBackend(LLMBackend):
+    """
+    Sleeps for `latency_s` (± `jitter_s`, plus `per_token_s` per prompt token)
+    and returns `responder(messages)`.
+    """
+
+    def __init__(
+            self,
+            latency_s: float = 0.5,
+            jitter_s: float = 0.0,
+            per_token_s: float = 0.0,
+            responder: Callable[[Messages], str] = default_stub_responder,
+            seed: Optional[int] = None,
+    ):
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.per_token_s = per_token_s
+        self.responder = responder
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1) -> LLMResponse:
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_s, self.jitter_s)
+        time.sleep(max(0.0, self.latency_s + jitter + self.per_token_s * prompt_tokens))
+        text = self.responder(messages)
+        return LLMResponse(text, prompt_tokens, estimate_tokens(text))
+
+# ─────────────────────────────────────────────────────────────
+# Usage accounting (used by the load generator)
+# ─────────────────────────────────────────────────────────────
+class UsageTracker(LLMBackend):
+    """Wraps a backend and sums calls and token usage across threads."""
+
+    def __init__(self, inner: LLMBackend):
+        self.inner = inner
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1) -> LLMResponse:
+        resp = self.inner.complete(messages, model, temperature)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += resp.prompt_tokens
+            self.completion_tokens += resp.completion_tokens
+        return resp
+
+# ─────────────────────────────────────────────────────────────
+# Factory (env: AICHAT_BACKEND=openai|stub|replay|record, AICHAT_RECORDINGS=path,
+#          AICHAT_REPLAY_LATENCY=1 to replay recorded latencies)
+# ─────────────────────────────────────────────────────────────
+def backend_from_env() -> LLMBackend:
+    kind = os.getenv("AICHAT_BACKEND", "openai").strip().lower()
+    recordings = os.getenv("AICHAT_RECORDINGS", "aichat_recordings.jsonl")
+    if kind == "openai":
+        return OpenAIBackend()
+    if kind == "stub":
+        return StubBackend(latency_s=float(os.getenv("AICHAT_STUB_LATENCY", "0.5")))
+    if kind == "replay":
+        return ReplayBackend(recordings, replay_latency=os.getenv("AICHAT_REPLAY_LATENCY", "0") == "1")
+    if kind == "record":
+        return RecordingBackend(OpenAIBackend(), recordings)
+    raise ValueError(f"Unknown AICHAT_BACKEND: {kind!r} (use openai, stub, replay or record).")
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import AiChat
+from llm_backends import LLMBackend, OpenAIBackend, RecordingBackend, ReplayBackend, StubBackend, UsageTracker
+
+# Used when no corpus file is given (same examples as the AiChat CLI)
+DEFAULT_QUESTIONS = [
+    "Compare the swimming status and advisories between Vinkeveense Plassen and Sloterplas in July 2025.",
+    "Which location had the poorest swimming status or strictest advisory in August 2025?",
+    "What is the latest swimming advisory for Nieuwe Meer, and what were the recent cyanobacteria (algae) risk levels?",
+]
+
+# ─────────────────────────────────────────────────────────────
+# Corpus + stats helpers
+# ─────────────────────────────────────────────────────────────
+def load_questions(path: Optional[str]) -> List[str]:
+    """One question per line (lines starting with '#' are skipped), or JSONL with a "question" key."""
+    if not path:
+        return list(DEFAULT_QUESTIONS)
+    questions = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        questions.append(json.loads(line)["question"] if line.startswith("{") else line)
+    return questions
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """Nearest-rank percentile on an already sorted list."""
+    if not sorted_vals:
+        return float("nan")
+    idx = min(len(sorted_vals) - 1, max(0, math.ceil(q / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[idx]
+
+# ─────────────────────────────────────────────────────────────
+# Load run
+# ─────────────────────────────────────────────────────────────
+def run_load(
+        questions: List[str],
+        backend: LLMBackend,
+        concurrency: int = 4,
+        n_requests: Optional[int] = None,
+        max_rows: int = 20,
+) -> Dict[str, Any]:
+    """
+    Replay `questions` (cycled up to n_requests) through AiChat.answer_question
+    with `concurrency` worker threads, and report latency, throughput and tokens.
+    """
+    if not questions:
+        raise ValueError("Question corpus is empty.")
+    n_requests = n_requests or len(questions)
+    work = [questions[i % len(questions)] for i in range(n_requests)]
+    tracker = UsageTracker(backend)
+    df = AiChat.get_data()
+
+    def _one(q: str) -> tuple[float, Optional[str]]:
+        t0 = time.perf_counter()
+        try:
+            AiChat.answer_question(q, df, max_rows=max_rows)
+            err = None
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+        return time.perf_counter() - t0, err
+
+    # Swap the process-wide AiChat backend only for the duration of the run
+    previous = AiChat._backend
+    AiChat.set_backend(tracker)
+    try:
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            results = list(ex.map(_one, work))
+        wall = time.perf_counter() - t_start
+    finally:
+        AiChat.set_backend(previous)
+
+    latencies = sorted(lat for lat, err in results if err is None)
+    errors = [err for _, err in results if err is not None]
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall > 0 else float("nan"),
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_p99_s": percentile(latencies, 99),
+        "latency_max_s": latencies[-1] if latencies else float("nan"),
+        "llm_calls": tracker.calls,
+        "prompt_tokens": tracker.prompt_tokens,
+        "completion_tokens": tracker.completion_tokens,
+    }
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    print(f"requests     {r['requests']} (ok {r['ok']}, errors {r['errors']}) at concurrency {r['concurrency']}")
+    print(f"wall time    {r['wall_s']:.2f} s, throughput {r['throughput_rps']:.2f} req/s")
+    print(f"latency      p50 {r['latency_p50_s']:.3f} s | p95 {r['latency_p95_s']:.3f} s | "
+          f"p99 {r['latency_p99_s']:.3f} s | max {r['latency_max_s']:.3f} s")
+    print(f"tokens       {r['prompt_tokens']} prompt + {r['completion_tokens']} completion in {r['llm_calls']} LLM calls")
+    if r["first_error"]:
+        print(f"first error  {r['first_error']}")
+
+# ─────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────
+def main():
+    ap = argparse.ArgumentParser(description="Replay a question corpus through the AiChat pipeline and measure latency.")
+    ap.add_argument("corpus", nargs="?", help="questions file (.txt one per line, or .jsonl with 'question'); default: built-in examples")
+    ap.add_argument("--backend", choices=["stub", "replay", "record", "openai"], default="stub")
+    ap.add_argument("--recordings", default="aichat_recordings.jsonl", help="JSONL file for --backend record/replay")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--requests", type=int, default=None, help="total requests (corpus is cycled); default: corpus size")
+    ap.add_argument("--latency", type=float, default=0.5, help="stub: base latency per LLM call in seconds")
+    ap.add_argument("--jitter", type=float, default=0.1, help="stub: uniform latency jitter in seconds")
+    ap.add_argument("--per-token", type=float, default=0.0, help="stub: extra seconds per prompt token")
+    ap.add_argument("--no-replay-latency", action="store_true", help="replay: answer instantly instead of sleeping the recorded latency")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+
+    if args.backend == "stub":
+        backend = StubBackend(args.latency, args.jitter, args.per_token, seed=0)
+    elif args.backend == "replay":
+        backend = ReplayBackend(args.recordings, replay_latency=not args.no_replay_latency)
+    elif args.backend == "record":
+        backend = RecordingBackend(OpenAIBackend(), args.recordings)
+    else:
+        backend = OpenAIBackend()
+
+    report = run_load(load_questions(args.corpus), backend, args.concurrency, args.requests)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
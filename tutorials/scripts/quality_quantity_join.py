@@ -0,0 +1,254 @@
+# filename: quality_quantity_join.py
+"""
+Temporal join between sparse FEWS quality samples and dense quantity series.
+
+Quality DataFrame requirements (same as the viewers):
+    columns = ['locatiecode','datum','fewsparameternaam','meetwaarde', ...]
+
+Quantity DataFrame requirements (e.g. Berlagebrug_debiet_waterhoogte.csv):
+    one datetime column (default 'datum') plus one or more numeric columns,
+    e.g. ['datum','debiet','waterhoogte'] at 10-minute resolution.
+    An optional key column (see `by`) allows several quantity stations in one frame.
+
+Exports:
+    - join_quantity_asof(quality, quantity, tolerance='1h', direction='nearest')
+    - join_quantity_window(quality, quantity, window='24h', aggs=('mean','min','max'))
+
+Both functions sort once, use pandas' vectorized merge_asof/rolling and return the
+quality rows (original order) with the quantity columns added, so the result can be
+passed straight to the viewers or grouped for the chat aggregates.
+
+Usage (in a notebook/Colab):
+    from quality_quantity_join import join_quantity_asof, join_quantity_window
+
+    q = join_quantity_asof(fychem, berlagebrug, tolerance='30min')
+    q[q['fewsparametercode'] == 'ECOLI'][['datum', 'meetwaarde', 'debiet']]
+
+    w = join_quantity_window(fychem, berlagebrug, window='48h', aggs=('mean', 'max'))
+"""
+
+from __future__ import annotations
+from typing import Iterable, Optional, Sequence
+
+import pandas as pd
+
+
+# ---------- Shared utilities ----------
+def _to_datetime_ns(s: pd.Series) -> pd.Series:
+    """Parse timestamps at one resolution; merge keys parsed from CSV (us) and ns must match."""
+    return pd.to_datetime(s, errors='coerce').astype('datetime64[ns]')
+
+
+def _window_label(win: pd.Timedelta) -> str:
+    """Column label with an explicit count: '30min', '1h', '24h', '7d', '90s'."""
+    secs = int(win.total_seconds())
+    if secs != win.total_seconds() or secs <= 0:
+        raise ValueError(f'window must be a positive whole number of seconds, got {win}.')
+    if secs % 86400 == 0 and secs > 86400:
+        return f'{secs // 86400}d'
+    if secs % 3600 == 0:
+        return f'{secs // 3600}h'
+    if secs % 60 == 0:
+        return f'{secs // 60}min'
+    return f'{secs}s'
+
+
+def _coerce_quality(df: pd.DataFrame, time_col: str) -> pd.DataFrame:
+    """Ensure datetime quality timestamps; keep the original row order in '_row'."""
+    df = df.copy()
+    df[time_col] = _to_datetime_ns(df[time_col])
+    df['_row'] = range(len(df))
+    return df
+
+
+def _coerce_quantity(
+    df: pd.DataFrame,
+    time_col: str,
+    value_cols: Optional[Sequence[str]],
+    by: Optional[str],
+) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Select value columns (default: numeric ones), coerce types and sort by time.
+    Rows without a timestamp or without any value are dropped, so an as-of match
+    never lands on an empty reading when a valid one is within tolerance.
+    """
+    if value_cols is None:
+        skip = {time_col, by}
+        value_cols = [c for c in df.select_dtypes('number').columns if c not in skip]
+    value_cols = list(value_cols)
+    keep = [time_col] + ([by] if by else []) + value_cols
+    df = df[keep].copy()
+    df[time_col] = _to_datetime_ns(df[time_col])
+    for c in value_cols:
+        df[c] = pd.to_numeric(df[c], errors='coerce')
+    df = df.dropna(subset=[time_col]).dropna(subset=value_cols, how='all')
+    return df.sort_values(time_col, kind='mergesort'), value_cols
+
+
+def _check_clashes(left: pd.DataFrame, new_cols: Iterable[str], hint: str) -> None:
+    """Refuse to silently rename quality columns to '<col>_x'/'<col>_y'."""
+    clashes = sorted(set(new_cols) & set(left.columns))
+    if clashes:
+        raise ValueError(f'Quantity columns {clashes} already exist in the quality frame; {hint}.')
+
+
+def _asof(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    time_col: str,
+    by: Optional[str],
+    tolerance: Optional[pd.Timedelta],
+    direction: str,
+) -> pd.DataFrame:
+    """merge_asof on sorted frames; rows without a timestamp are re-attached unmatched."""
+    has_time = left[time_col].notna()
+    matched = pd.merge_asof(
+        left[has_time].sort_values(time_col, kind='mergesort'),
+        right,
+        on=time_col,
+        by=by,
+        tolerance=tolerance,
+        direction=direction,
+    )
+    out = pd.concat([matched, left[~has_time]], ignore_index=True)
+    return out.sort_values('_row', kind='mergesort').drop(columns='_row').reset_index(drop=True)
+
+
+# ---------- As-of join ----------
+def join_quantity_asof(
+    quality: pd.DataFrame,
+    quantity: pd.DataFrame,
+    tolerance: Optional[str | pd.Timedelta] = '1h',
+    direction: str = 'nearest',
+    value_cols: Optional[Sequence[str]] = None,
+    by: Optional[str] = None,
+    time_col: str = 'datum',
+    suffix: str = '',
+) -> pd.DataFrame:
+    """
+    Attach, to every quality sample, the quantity reading closest in time.
+
+    direction: 'backward' (last reading at or before the sample), 'forward' or 'nearest'.
+    tolerance: maximum time distance; samples without a reading in range get NaN.
+    by:        optional key column present in both frames (e.g. 'locatiecode') so each
+               sample is only matched against its own quantity station.
+    suffix:    appended to the quantity column names to avoid clashes.
+    """
+    tol = pd.Timedelta(tolerance) if tolerance is not None else None
+    left = _coerce_quality(quality, time_col)
+    right, value_cols = _coerce_quantity(quantity, time_col, value_cols, by)
+    if suffix:
+        right = right.rename(columns={c: f'{c}{suffix}' for c in value_cols})
+    _check_clashes(left, [f'{c}{suffix}' for c in value_cols], "pass a suffix, value_cols or by")
+    return _asof(left, right, time_col, by, tol, direction)
+
+
+# ---------- Windowed join ----------
+def join_quantity_window(
+    quality: pd.DataFrame,
+    quantity: pd.DataFrame,
+    window: str | pd.Timedelta = '24h',
+    aggs: Iterable[str] = ('mean', 'min', 'max'),
+    value_cols: Optional[Sequence[str]] = None,
+    by: Optional[str] = None,
+    time_col: str = 'datum',
+) -> pd.DataFrame:
+    """
+    Attach, to every quality sample, aggregates of the quantity series over the
+    trailing `window` ending at the sample time, i.e. [sample - window, sample]
+    (e.g. mean discharge in the 24h before an E. coli sample).
+
+    The sample timestamps are inserted as empty probe rows into the quantity series and
+    a single rolling pass is read back at those rows, so the cost is one sort plus one pass.
+    A window without quantity readings (data gap) gives NaN.
+    Output columns are named '<column>_<agg>_<window>', e.g. 'debiet_mean_24h', 'debiet_max_90min'
+    or 'debiet_mean_7d' (whole days are used for windows longer than 24h).
+
+    aggs: any rolling aggregation name ('mean','min','max','sum','std','count',...).
+    """
+    win = pd.Timedelta(window)
+    aggs = list(aggs)
+    label = _window_label(win)
+
+    left = _coerce_quality(quality, time_col)
+    right, value_cols = _coerce_quantity(quantity, time_col, value_cols, by)
+    _check_clashes(left, [f'{c}_{a}_{label}' for c in value_cols for a in aggs], "pass value_cols")
+    samples = left[[time_col] + ([by] if by else [])].dropna().drop_duplicates()
+
+    def _rolled(g: pd.DataFrame, times: pd.Series) -> pd.DataFrame:
+        # Probe rows sort after readings with the same timestamp, so those readings are included
+        probes = pd.DataFrame({time_col: times.to_numpy()}).assign(_probe=True)
+        both = pd.concat([g[[time_col] + value_cols].assign(_probe=False), probes], ignore_index=True)
+        both = both.sort_values([time_col, '_probe'], kind='mergesort').set_index(time_col)
+        r = both[value_cols].rolling(win, closed='both').agg(aggs)[both['_probe'].to_numpy()]
+        r.columns = [f'{c}_{a}_{label}' for c, a in r.columns]
+        return r.reset_index()
+
+    if by is None:
+        rolled = _rolled(right, samples[time_col])
+    else:
+        parts = []
+        for key, g in right.groupby(by, sort=False):
+            times = samples.loc[samples[by] == key, time_col]
+            if times.empty:
+                continue
+            r = _rolled(g, times)
+            r[by] = key
+            parts.append(r)
+        rolled = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[time_col, by])
+
+    out = left.merge(rolled, on=[time_col] + ([by] if by else []), how='left')
+    return out.sort_values('_row', kind='mergesort').drop(columns='_row').reset_index(drop=True)
+
+
+# ---------- Self-check (python quality_quantity_join.py) ----------
+def _self_check() -> None:
+    quantity = pd.DataFrame({
+        'datum': pd.to_datetime(['2020-01-01 00:00', '2020-01-01 12:00', '2020-01-02 00:00']),
+        'debiet': [100.0, 1.0, 1.0],
+    })
+    quality = pd.DataFrame({
+        'locatiecode': ['A', 'B', 'C'],
+        'datum': pd.to_datetime(['2020-01-02 11:00', '2020-01-02 00:00', '2020-01-05 00:00']),
+        'meetwaarde': [1.0, 2.0, 3.0],
+    })
+    w = join_quantity_window(quality, quantity, window='24h')
+    # Window ends at the sample, not at the last reading before it
+    assert w.loc[0, 'debiet_mean_24h'] == 1.0 and w.loc[0, 'debiet_max_24h'] == 1.0
+    # Both window edges are included
+    assert w.loc[1, 'debiet_mean_24h'] == 34.0
+    # Data gap longer than the window: no stale values
+    assert w.loc[2, ['debiet_mean_24h', 'debiet_max_24h']].isna().all()
+    # Quality parsed from strings (us on pandas 3) against a ns quantity frame
+    quality_str = quality.assign(datum=['2020-01-02 11:00', '2020-01-02 00:00', '2020-01-05 00:00'])
+    quantity_ns = quantity.assign(datum=quantity['datum'].astype('datetime64[ns]'))
+    assert join_quantity_asof(quality_str, quantity_ns, tolerance=None, direction='backward').loc[0, 'debiet'] == 1.0
+    assert join_quantity_window(quality_str, quantity_ns).loc[0, 'debiet_mean_24h'] == 1.0
+    # Sub-hour and non-whole-hour windows keep distinct labels
+    assert 'debiet_mean_30min' in join_quantity_window(quality, quantity, window=pd.Timedelta('30min'))
+    assert 'debiet_mean_90min' in join_quantity_window(quality, quantity, window=pd.Timedelta('90min'))
+    # Only numeric quantity columns are joined by default; clashing names are refused
+    quantity_coded = quantity.assign(locatiecode='BERLAGEBRUG')
+    assert 'locatiecode_x' not in join_quantity_asof(quality, quantity_coded)
+    try:
+        join_quantity_asof(quality, quantity.assign(meetwaarde=0.0))
+        raise AssertionError('expected a column clash error')
+    except ValueError:
+        pass
+    assert 'meetwaarde_q' in join_quantity_asof(quality, quantity.assign(meetwaarde=0.0), suffix='_q')
+    # Empty readings are skipped: 00:21 matches the valid 00:30 reading, not the NaN at 00:20
+    gappy = pd.DataFrame({
+        'datum': pd.to_datetime(['2020-01-01 00:10', '2020-01-01 00:20', '2020-01-01 00:30']),
+        'debiet': [10.0, float('nan'), 30.0],
+    })
+    sample = quality.iloc[:1].assign(datum=pd.Timestamp('2020-01-01 00:21'))
+    assert join_quantity_asof(sample, gappy, tolerance='15min').loc[0, 'debiet'] == 30.0
+    # Labels always carry a count
+    assert 'debiet_mean_1h' in join_quantity_window(quality, quantity, window='1h')
+    assert 'debiet_mean_1min' in join_quantity_window(quality, quantity, window='1min')
+    assert 'debiet_mean_7d' in join_quantity_window(quality, quantity, window='7D')
+    print('quality_quantity_join: ok')
+
+
+if __name__ == '__main__':
+    _self_check()
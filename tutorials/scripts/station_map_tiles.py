@@ -0,0 +1,266 @@
+# filename: station_map_tiles.py
+"""
+Zoom-aware map layers for the FYCHEM/HB station GeoJSONs.
+
+Input:
+    data/waternet FEWS data/{FYCHEM,HB}_unique_locations_with_measurements.geojson
+    optionally a measurement DataFrame to attach the latest value per parameter:
+        columns = ['locatiecode','datum','fewsparametercode','meetwaarde']
+
+Output (instead of shipping the full 2-3 MB GeoJSON to the browser):
+    - pre-binned tiles  out_dir/{z}/{x}/{y}.json (Web Mercator / XYZ scheme) plus
+      out_dir/tiles.json (zooms, bounds, parameters, list of non-empty tiles).
+      Below max_zoom, stations are binned on a fixed grid of `cluster_px` x `cluster_px`
+      screen-pixel cells and each non-empty cell becomes one cluster (count, centroid,
+      summed observations, mean of the latest values). Two nearby stations on opposite
+      sides of a cell edge stay separate.
+      Each tile is columnar JSON: {"lon": [...], "lat": [...], "count": [...], "NH4": [...], ...}
+    - a compact binary point file (export_points_binary) with the same attribute columns.
+    The bulky `parameter_counts` strings are reduced to `n_parameters`.
+
+Exports:
+    - load_stations(geojson_path)
+    - latest_values(df, parameters=None, param_col='fewsparametercode')
+    - build_tiles(stations, values=None, min_zoom=8, max_zoom=14, cluster_px=64)
+    - export_tiles(geojson_path, out_dir, df=None, parameters=None, min_zoom=8, max_zoom=14,
+                   param_col='fewsparametercode')
+    - export_points_binary(stations, path, values=None) / read_points_binary(path)
+
+Usage (in a notebook/Colab):
+    from station_map_tiles import export_tiles
+
+    export_tiles(path / 'data/waternet FEWS data/FYCHEM_unique_locations_with_measurements.geojson',
+                 'ecochat/public/tiles/fychem', df=df, parameters=['NH4', 'ECOLI', 'O2'])
+"""
+
+from __future__ import annotations
+import ast
+import json
+import math
+import re
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TILE_SIZE = 256
+BINARY_MAGIC = b'AMPT'
+_NP_SCALAR = re.compile(r'np\.\w+\(([^()]*)\)')
+
+Values = Dict[str, Dict[str, float]]
+
+
+# ---------- Shared utilities ----------
+def parse_parameter_counts(s: str) -> Dict[str, int]:
+    """Parse "{'MEA_n': np.int64(426), ...}" into {'MEA_n': 426, ...}."""
+    if not s:
+        return {}
+    try:
+        return {k: int(v) for k, v in ast.literal_eval(_NP_SCALAR.sub(r'\1', s)).items()}
+    except (ValueError, SyntaxError):
+        return {}
+
+
+def lonlat_to_pixel(lon: float, lat: float, z: int) -> Tuple[float, float]:
+    """WGS84 -> global Web Mercator pixel coordinates at zoom z."""
+    scale = TILE_SIZE * (1 << z)
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = (lon + 180.0) / 360.0 * scale
+    s = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def _mean(vals: Iterable[Optional[float]]) -> Optional[float]:
+    v = [x for x in vals if x is not None and not math.isnan(x)]
+    return sum(v) / len(v) if v else None
+
+
+def _round(x: Optional[float], digits: int = 4) -> Optional[float]:
+    """Round to significant digits so tiny concentrations keep their precision."""
+    return None if x is None else float(f'{x:.{digits}g}')
+
+
+# ---------- Input ----------
+def load_stations(geojson_path: str | Path) -> List[dict]:
+    """Read a station GeoJSON into slim dicts (code, lon, lat, observations, n_parameters)."""
+    with open(geojson_path, encoding='utf-8') as f:
+        fc = json.load(f)
+    stations = []
+    for feat in fc['features']:
+        props, geom = feat['properties'], feat.get('geometry')
+        if not geom or not geom.get('coordinates'):
+            continue
+        lon, lat = geom['coordinates'][:2]
+        stations.append({
+            'locatiecode': props['locatiecode'],
+            'lon': float(lon),
+            'lat': float(lat),
+            'total_observations': int(props.get('total_observations') or 0),
+            'n_parameters': len(parse_parameter_counts(props.get('parameter_counts', ''))),
+        })
+    return stations
+
+
+def latest_values(df, parameters: Optional[Iterable[str]] = None, param_col: str = 'fewsparametercode') -> Values:
+    """Latest measurement per station and parameter: {'AMS002': {'NH4': 0.12, ...}, ...}."""
+    import pandas as pd
+
+    d = df[['locatiecode', 'datum', param_col, 'meetwaarde']].copy()
+    if parameters is not None:
+        d = d[d[param_col].isin(list(parameters))]
+    d['datum'] = pd.to_datetime(d['datum'], errors='coerce')
+    d['meetwaarde'] = pd.to_numeric(d['meetwaarde'], errors='coerce')
+    d = d.dropna(subset=['datum', 'meetwaarde'])
+    last = d.sort_values('datum', kind='mergesort').groupby(['locatiecode', param_col], sort=False).tail(1)
+    out: Values = {}
+    for code, param, val in zip(last['locatiecode'], last[param_col], last['meetwaarde']):
+        out.setdefault(code, {})[param] = float(val)
+    return out
+
+
+# ---------- Tiling ----------
+def _cluster(members: List[dict], parameters: List[str], values: Values) -> dict:
+    n = len(members)
+    return {
+        'locatiecode': members[0]['locatiecode'] if n == 1 else None,
+        'lon': sum(m['lon'] for m in members) / n,
+        'lat': sum(m['lat'] for m in members) / n,
+        'count': n,
+        'total_observations': sum(m['total_observations'] for m in members),
+        'n_parameters': max(m['n_parameters'] for m in members),
+        **{p: _mean(values.get(m['locatiecode'], {}).get(p) for m in members) for p in parameters},
+    }
+
+
+def build_tiles(
+    stations: List[dict],
+    values: Optional[Values] = None,
+    min_zoom: int = 8,
+    max_zoom: int = 14,
+    cluster_px: int = 64,
+) -> Dict[Tuple[int, int, int], dict]:
+    """
+    Bin stations into XYZ tiles for every zoom in [min_zoom, max_zoom].
+    Below max_zoom, stations in the same `cluster_px` grid cell (global pixel
+    coordinates at that zoom) form one cluster; at max_zoom every station is its own point.
+    Returns {(z, x, y): columnar tile dict}.
+    """
+    values = values or {}
+    parameters = sorted({p for v in values.values() for p in v})
+    columns = ['locatiecode', 'lon', 'lat', 'count', 'total_observations', 'n_parameters'] + parameters
+    tiles: Dict[Tuple[int, int, int], dict] = {}
+
+    for z in range(min_zoom, max_zoom + 1):
+        bins: Dict[Tuple[int, int], List[dict]] = {}
+        for i, s in enumerate(stations):
+            px, py = lonlat_to_pixel(s['lon'], s['lat'], z)
+            key = (int(px // cluster_px), int(py // cluster_px)) if z < max_zoom else (i, -1)
+            bins.setdefault(key, []).append(s)
+
+        for members in bins.values():
+            c = _cluster(members, parameters, values)
+            px, py = lonlat_to_pixel(c['lon'], c['lat'], z)
+            tile = tiles.setdefault((z, int(px // TILE_SIZE), int(py // TILE_SIZE)), {k: [] for k in columns})
+            for k in columns:
+                v = c[k]
+                tile[k].append(round(v, 6) if k in ('lon', 'lat') else (_round(v) if k in parameters else v))
+    return tiles
+
+
+def export_tiles(
+    geojson_path: str | Path,
+    out_dir: str | Path,
+    df=None,
+    parameters: Optional[Iterable[str]] = None,
+    min_zoom: int = 8,
+    max_zoom: int = 14,
+    cluster_px: int = 64,
+    param_col: str = 'fewsparametercode',
+) -> dict:
+    """
+    Write out_dir/{z}/{x}/{y}.json tiles and out_dir/tiles.json; returns the manifest.
+    When df is given, the latest value of each parameter (all, or only `parameters`)
+    is attached as an attribute column; param_col names the parameter column
+    (e.g. 'fewsparameternaam' for frames prepared for the viewers).
+    """
+    stations = load_stations(geojson_path)
+    values = latest_values(df, parameters, param_col) if df is not None else None
+    tiles = build_tiles(stations, values, min_zoom, max_zoom, cluster_px)
+
+    out_dir = Path(out_dir)
+    for (z, x, y), tile in tiles.items():
+        p = out_dir / str(z) / str(x) / f'{y}.json'
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(json.dumps(tile, separators=(',', ':'), allow_nan=False), encoding='utf-8')
+
+    manifest = {
+        'scheme': 'xyz',
+        'min_zoom': min_zoom,
+        'max_zoom': max_zoom,
+        'bounds': [
+            min(s['lon'] for s in stations), min(s['lat'] for s in stations),
+            max(s['lon'] for s in stations), max(s['lat'] for s in stations),
+        ] if stations else None,
+        'parameters': sorted({p for v in (values or {}).values() for p in v}),
+        'tiles': sorted([z, x, y] for z, x, y in tiles),
+    }
+    (out_dir / 'tiles.json').write_text(json.dumps(manifest, separators=(',', ':')), encoding='utf-8')
+    return manifest
+
+
+# ---------- Compact binary points ----------
+def export_points_binary(stations: List[dict], path: str | Path, values: Optional[Values] = None) -> None:
+    """
+    Write all stations as one columnar little-endian file:
+        b'AMPT' | uint32 header length | JSON header | float32 lon | float32 lat |
+        uint32 total_observations | uint16 n_parameters | float32 per parameter (NaN = missing)
+    The header holds the row count, station codes and parameter names.
+    """
+    values = values or {}
+    parameters = sorted({p for v in values.values() for p in v})
+    header = json.dumps({
+        'n': len(stations),
+        'locatiecode': [s['locatiecode'] for s in stations],
+        'parameters': parameters,
+    }, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-(len(BINARY_MAGIC) + 4 + len(header)) % 4)  # keep arrays 4-byte aligned
+
+    cols = [
+        array('f', [s['lon'] for s in stations]),
+        array('f', [s['lat'] for s in stations]),
+        array('I', [s['total_observations'] for s in stations]),
+        array('H', [min(s['n_parameters'], 0xFFFF) for s in stations]),
+    ]
+    if len(stations) % 2:
+        cols[-1].append(0)  # pad the uint16 column to 4 bytes
+    for p in parameters:
+        cols.append(array('f', [values.get(s['locatiecode'], {}).get(p, math.nan) for s in stations]))
+
+    with open(path, 'wb') as f:
+        f.write(BINARY_MAGIC + struct.pack('<I', len(header)) + header)
+        for c in cols:
+            if struct.pack('=H', 1) != struct.pack('<H', 1):
+                c.byteswap()
+            f.write(c.tobytes())
+
+
+def read_points_binary(path: str | Path) -> dict:
+    """Read a file written by export_points_binary back into {column: list}."""
+    raw = Path(path).read_bytes()
+    if raw[:4] != BINARY_MAGIC:
+        raise ValueError(f'{path} is not a station point file.')
+    (hlen,) = struct.unpack_from('<I', raw, 4)
+    header = json.loads(raw[8:8 + hlen])
+    n, offset = header['n'], 8 + hlen
+    out = {'locatiecode': header['locatiecode']}
+    layout = [('lon', 'f', n), ('lat', 'f', n), ('total_observations', 'I', n), ('n_parameters', 'H', n + n % 2)]
+    layout += [(p, 'f', n) for p in header['parameters']]
+    for name, code, count in layout:
+        a = array(code)
+        a.frombytes(raw[offset:offset + a.itemsize * count])
+        if struct.pack('=H', 1) != struct.pack('<H', 1):
+            a.byteswap()
+        out[name] = a.tolist()[:n]
+        offset += a.itemsize * count
+    return out
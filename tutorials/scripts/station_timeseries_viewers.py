@@ -20,13 +20,13 @@ Usage (in a notebook/Colab):
 
     viewer2 = create_viewer_two_params_two_stations(df, max_gap_days=365)
     display(viewer2)
+
+matplotlib and ipywidgets are imported when a viewer is created, not at module load.
 """
 
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from ipywidgets import Dropdown, VBox, HBox, Output, Layout
 
 
 # ---------- Shared utilities ----------
@@ -79,6 +79,9 @@ def create_viewer_one_param_two_stations(df: pd.DataFrame, max_gap_days: int = 1
     Interactive viewer: select one parameter and compare two stations (same y-axis if units match).
     Returns a VBox widget you can display().
     """
+    import matplotlib.pyplot as plt
+    from ipywidgets import Dropdown, VBox, HBox, Output, Layout
+
     df = _coerce_df(df)
 
     station_options = sorted(df['locatiecode'].dropna().unique().tolist())
@@ -158,6 +161,9 @@ def create_viewer_two_params_two_stations(df: pd.DataFrame, max_gap_days: int =
     Uses dual y-axes when params/units differ and both series exist.
     Returns a VBox widget you can display().
     """
+    import matplotlib.pyplot as plt
+    from ipywidgets import Dropdown, VBox, HBox, Output, Layout
+
     df = _coerce_df(df)
 
     station_options = sorted(df['locatiecode'].dropna().unique().tolist())
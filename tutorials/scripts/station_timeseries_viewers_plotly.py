@@ -12,12 +12,17 @@ Exports (Figure-returning):
 Optional (ipywidgets viewers for notebooks):
     - create_plotly_viewer_one_param_two_stations(df, max_gap_days=180)
     - create_plotly_viewer_two_params_two_stations(df, max_gap_days=365)
+
+plotly and ipywidgets are imported on first use, so importing this module only loads pandas/numpy.
 """
 
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # ---------- Shared utilities ----------
 def _coerce_df(df: pd.DataFrame) -> pd.DataFrame:
@@ -58,6 +63,8 @@ def make_plotly_timeseries(
         fig = make_plotly_timeseries(df, 'BOT001', 'AMS002', 'Zuurgraad', 180)
         fig.show()
     """
+    import plotly.graph_objects as go
+
     dfx = _coerce_df(df)
     d1 = dfx[(dfx['locatiecode'] == station1) & (dfx['fewsparameternaam'] == param)][['datum','meetwaarde','eenheid']].dropna(subset=['datum'])
     d2 = dfx[(dfx['locatiecode'] == station2) & (dfx['fewsparameternaam'] == param)][['datum','meetwaarde','eenheid']].dropna(subset=['datum'])
@@ -150,6 +157,8 @@ def make_plotly_timeseries_two_params(
         fig = make_plotly_timeseries_two_params(df, 'BOT001','Zuurgraad', 'AMS002','Temperatuur', 365)
         fig.show()
     """
+    import plotly.graph_objects as go
+
     dfx = _coerce_df(df)
     d1 = dfx[(dfx['locatiecode'] == station1) & (dfx['fewsparameternaam'] == param1)][['datum','meetwaarde','eenheid']].dropna(subset=['datum'])
     d2 = dfx[(dfx['locatiecode'] == station2) & (dfx['fewsparameternaam'] == param2)][['datum','meetwaarde','eenheid']].dropna(subset=['datum'])
@@ -236,71 +245,67 @@ def make_plotly_timeseries_two_params(
     fig.update_layout(**layout)
     return fig
 
-# ---------- Optional ipywidgets viewers (not required for plain Figure use) ----------
-try:
+# ---------- Optional ipywidgets viewers (ipywidgets is imported on first use) ----------
+def create_plotly_viewer_one_param_two_stations(df: pd.DataFrame, max_gap_days: int = 180):
+    from ipywidgets import Dropdown, VBox, HBox, Output, Layout
+
+    dfx = _coerce_df(df)
+    station_options = sorted(dfx['locatiecode'].dropna().unique().tolist())
+    param_options   = sorted(dfx['fewsparameternaam'].dropna().unique().tolist())
+
+    st1 = Dropdown(options=station_options, description='Station 1:', layout=Layout(width='45%'))
+    st2 = Dropdown(options=station_options, description='Station 2:', layout=Layout(width='45%'))
+    pa  = Dropdown(options=param_options,   description='Parameter:', layout=Layout(width='45%'))
+
+    out = Output(layout=Layout(border='1px solid #ddd'))
+
+    def _draw(*_):
+        with out:
+            out.clear_output(wait=True)
+            fig = make_plotly_timeseries(dfx, st1.value, st2.value, pa.value, max_gap_days=max_gap_days)
+            fig.show()
+
+    # init
+    if station_options and param_options:
+        st1.value = station_options[0]
+        st2.value = station_options[1] if len(station_options) > 1 else station_options[0]
+        pa.value  = param_options[0]
+        _draw()
+
+    for w in (st1, st2, pa):
+        w.observe(_draw, names='value')
+
+    return VBox([HBox([st1, st2]), pa, out])
+
+def create_plotly_viewer_two_params_two_stations(df: pd.DataFrame, max_gap_days: int = 365):
     from ipywidgets import Dropdown, VBox, HBox, Output, Layout
-    from IPython.display import display
-
-    def create_plotly_viewer_one_param_two_stations(df: pd.DataFrame, max_gap_days: int = 180):
-        dfx = _coerce_df(df)
-        station_options = sorted(dfx['locatiecode'].dropna().unique().tolist())
-        param_options   = sorted(dfx['fewsparameternaam'].dropna().unique().tolist())
-
-        st1 = Dropdown(options=station_options, description='Station 1:', layout=Layout(width='45%'))
-        st2 = Dropdown(options=station_options, description='Station 2:', layout=Layout(width='45%'))
-        pa  = Dropdown(options=param_options,   description='Parameter:', layout=Layout(width='45%'))
-
-        out = Output(layout=Layout(border='1px solid #ddd'))
-
-        def _draw(*_):
-            with out:
-                out.clear_output(wait=True)
-                fig = make_plotly_timeseries(dfx, st1.value, st2.value, pa.value, max_gap_days=max_gap_days)
-                fig.show()
-
-        # init
-        if station_options and param_options:
-            st1.value = station_options[0]
-            st2.value = station_options[1] if len(station_options) > 1 else station_options[0]
-            pa.value  = param_options[0]
-            _draw()
-
-        for w in (st1, st2, pa):
-            w.observe(_draw, names='value')
-
-        return VBox([HBox([st1, st2]), pa, out])
-
-    def create_plotly_viewer_two_params_two_stations(df: pd.DataFrame, max_gap_days: int = 365):
-        dfx = _coerce_df(df)
-        station_options = sorted(dfx['locatiecode'].dropna().unique().tolist())
-        param_options   = sorted(dfx['fewsparameternaam'].dropna().unique().tolist())
-
-        st1 = Dropdown(options=station_options, description='Station 1:', layout=Layout(width='45%'))
-        st2 = Dropdown(options=station_options, description='Station 2:', layout=Layout(width='45%'))
-        p1  = Dropdown(options=param_options,   description='Param 1:',   layout=Layout(width='45%'))
-        p2  = Dropdown(options=param_options,   description='Param 2:',   layout=Layout(width='45%'))
-
-        out = Output(layout=Layout(border='1px solid #ddd'))
-
-        def _draw(*_):
-            with out:
-                out.clear_output(wait=True)
-                fig = make_plotly_timeseries_two_params(dfx, st1.value, p1.value, st2.value, p2.value, max_gap_days=max_gap_days)
-                fig.show()
-
-        # init
-        if station_options and param_options:
-            st1.value = station_options[0]
-            st2.value = station_options[1] if len(station_options) > 1 else station_options[0]
-            p1.value  = param_options[0]
-            p2.value  = param_options[min(1, len(param_options)-1)]
-            _draw()
-
-        for w in (st1, st2, p1, p2):
-            w.observe(_draw, names='value')
-
-        return VBox([HBox([st1, st2]), HBox([p1, p2]), out])
-
-except Exception:
-    # ipywidgets not available; figure-returning functions still work
-    pass
+
+    dfx = _coerce_df(df)
+    station_options = sorted(dfx['locatiecode'].dropna().unique().tolist())
+    param_options   = sorted(dfx['fewsparameternaam'].dropna().unique().tolist())
+
+    st1 = Dropdown(options=station_options, description='Station 1:', layout=Layout(width='45%'))
+    st2 = Dropdown(options=station_options, description='Station 2:', layout=Layout(width='45%'))
+    p1  = Dropdown(options=param_options,   description='Param 1:',   layout=Layout(width='45%'))
+    p2  = Dropdown(options=param_options,   description='Param 2:',   layout=Layout(width='45%'))
+
+    out = Output(layout=Layout(border='1px solid #ddd'))
+
+    def _draw(*_):
+        with out:
+            out.clear_output(wait=True)
+            fig = make_plotly_timeseries_two_params(dfx, st1.value, p1.value, st2.value, p2.value, max_gap_days=max_gap_days)
+            fig.show()
+
+    # init
+    if station_options and param_options:
+        st1.value = station_options[0]
+        st2.value = station_options[1] if len(station_options) > 1 else station_options[0]
+        p1.value  = param_options[0]
+        p2.value  = param_options[min(1, len(param_options)-1)]
+        _draw()
+
+    for w in (st1, st2, p1, p2):
+        w.observe(_draw, names='value')
+
+    return VBox([HBox([st1, st2]), HBox([p1, p2]), out])
@@ -0,0 +1,294 @@
+# filename: trend_statistics.py
+"""
+Precomputed yearly/seasonal statistics and trend tests per station and parameter.
+
+DataFrame requirements (raw FEWS export, as in the analysis notebook):
+    columns = ['locatiecode','datum','fewsparametercode','meetwaarde']
+
+The result is a single long "cube" DataFrame with one row per
+(locatiecode, parameter, period_type, period):
+    period_type 'year'   -> period '2019', '2020', ...
+    period_type 'season' -> period 'DJF', 'MAM', 'JJA', 'SON' (all years pooled)
+    period_type 'all'    -> period 'all'; this row also carries the trend test
+                            (Mann-Kendall on yearly means + Sen slope) and the
+                            fingerprint used for incremental updates.
+
+Exports:
+    - build_trend_cube(df, *, param_col='fewsparametercode', n_jobs=None)
+    - update_trend_cube(cube, df, *, param_col='fewsparametercode', n_jobs=None)
+    - save_trend_cube(cube, path) / load_trend_cube(path)
+    - get_trend(cube, station, parameter)
+    - get_period_stats(cube, station, parameter, period_type='year')
+
+Usage (in a notebook/Colab):
+    from trend_statistics import build_trend_cube, save_trend_cube, get_trend
+
+    cube = build_trend_cube(df)                 # trend tests on all cores
+    save_trend_cube(cube, 'trend_cube.csv.gz')
+    get_trend(cube, 'AMS002', 'NH4')            # {'trend': 'decreasing', 'sen_slope': ..., ...}
+"""
+
+from __future__ import annotations
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+KEY_COLS = ['locatiecode', 'parameter']
+CATEGORY_COLS = ['locatiecode', 'parameter', 'period_type', 'period', 'trend']
+# Only set on some rows (NaN elsewhere), so stored as nullable integers instead of float64
+INT_COLS = {'count': 'Int32', 'n_years': 'Int32', 'first_year': 'Int32', 'last_year': 'Int32', 'n_total': 'Int64'}
+SEASONS = {12: 'DJF', 1: 'DJF', 2: 'DJF', 3: 'MAM', 4: 'MAM', 5: 'MAM',
+           6: 'JJA', 7: 'JJA', 8: 'JJA', 9: 'SON', 10: 'SON', 11: 'SON'}
+MIN_TREND_YEARS = 4
+ALPHA = 0.05
+
+
+# ---------- Shared utilities ----------
+def _coerce_df(df: pd.DataFrame, param_col: str) -> pd.DataFrame:
+    """Keep the needed columns, coerce types and drop unusable rows."""
+    df = df[['locatiecode', 'datum', param_col, 'meetwaarde']].rename(columns={param_col: 'parameter'})
+    df['datum'] = pd.to_datetime(df['datum'], errors='coerce').astype('datetime64[ns]')
+    df['meetwaarde'] = pd.to_numeric(df['meetwaarde'], errors='coerce')
+    return df.dropna()
+
+
+def _fingerprints(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-series fingerprint to detect changed series: count, last date and a content hash
+    (wrapping sum of per-row hashes of datum + meetwaarde), so re-dated samples and
+    sum-preserving corrections are detected as well. Row order does not matter.
+    """
+    hashes = pd.util.hash_pandas_object(df[['datum', 'meetwaarde']], index=False)
+    fp = df.assign(_hash=hashes).groupby(KEY_COLS, sort=False).agg(
+        n_total=('meetwaarde', 'size'),
+        last_datum=('datum', 'max'),
+        content_hash=('_hash', 'sum'),
+    )
+    fp['content_hash'] = fp['content_hash'].astype('UInt64')
+    return fp
+
+
+def mann_kendall(values: np.ndarray) -> tuple[float, float, float]:
+    """Mann-Kendall test with tie correction. Returns (S, Z, two-sided p-value)."""
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    if n < 2:
+        return np.nan, np.nan, np.nan
+    diff = np.sign(x[None, :] - x[:, None])
+    s = float(np.triu(diff, k=1).sum())
+    _, ties = np.unique(x, return_counts=True)
+    var_s = (n * (n - 1) * (2 * n + 5) - np.sum(ties * (ties - 1) * (2 * ties + 5))) / 18.0
+    if var_s <= 0:
+        return s, 0.0, 1.0
+    z = (s - np.sign(s)) / math.sqrt(var_s)
+    p = math.erfc(abs(z) / math.sqrt(2.0))
+    return s, z, p
+
+
+def sen_slope(years: np.ndarray, values: np.ndarray) -> float:
+    """Median of all pairwise slopes (units per year)."""
+    t = np.asarray(years, dtype=float)
+    x = np.asarray(values, dtype=float)
+    i, j = np.triu_indices(len(x), k=1)
+    dt = t[j] - t[i]
+    ok = dt != 0
+    return float(np.median((x[j] - x[i])[ok] / dt[ok])) if ok.any() else np.nan
+
+
+# ---------- Cube computation ----------
+def _period_stats(df: pd.DataFrame, period_type: str, period: pd.Series) -> pd.DataFrame:
+    """Vectorized count/mean/min/max/percentiles per series and period."""
+    g = df.groupby(KEY_COLS + [period.rename('period')], sort=False, observed=True)['meetwaarde']
+    out = g.agg(['count', 'mean', 'min', 'max'])
+    q = g.quantile([0.1, 0.5, 0.9]).unstack()
+    q.columns = ['p10', 'p50', 'p90']
+    out = out.join(q).reset_index()
+    out['period'] = out['period'].astype(str)
+    out.insert(2, 'period_type', period_type)
+    return out
+
+
+def _trend_chunk(chunk: list[tuple[tuple, np.ndarray, np.ndarray]]) -> list[dict]:
+    """Trend tests on the yearly means of a batch of series (runs in worker processes)."""
+    rows = []
+    for key, years, means in chunk:
+        if len(means) >= MIN_TREND_YEARS:
+            s, z, p = mann_kendall(means)
+            slope = sen_slope(years, means)
+            trend = 'no trend' if p >= ALPHA else ('increasing' if z > 0 else 'decreasing')
+        else:
+            s = z = p = slope = np.nan
+            trend = 'insufficient data'
+        rows.append({
+            'locatiecode': key[0], 'parameter': key[1],
+            'n_years': len(means), 'first_year': int(years.min()), 'last_year': int(years.max()),
+            'mk_s': s, 'mk_z': z, 'mk_p': p, 'sen_slope': slope, 'trend': trend,
+        })
+    return rows
+
+
+def _trends(df: pd.DataFrame, n_jobs: Optional[int]) -> pd.DataFrame:
+    """Mann-Kendall + Sen slope per series, spread over n_jobs processes."""
+    yearly = df.groupby(KEY_COLS + [df['datum'].dt.year.rename('year')], sort=True)['meetwaarde'].mean()
+    series = [
+        (key, g.index.get_level_values('year').to_numpy(), g.to_numpy())
+        for key, g in yearly.groupby(level=KEY_COLS, sort=False)
+    ]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(series) < 100 * n_jobs:
+        rows = _trend_chunk(series)
+    else:
+        chunks = [series[i::n_jobs] for i in range(n_jobs)]
+        rows = []
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            for part in ex.map(_trend_chunk, chunks):
+                rows += part
+    return pd.DataFrame(rows).assign(period_type='all')
+
+
+def _compute(df: pd.DataFrame, n_jobs: Optional[int]) -> pd.DataFrame:
+    """All cube rows for every series in df."""
+    if df.empty:
+        return pd.DataFrame()
+    stats = pd.concat([
+        _period_stats(df, 'year', df['datum'].dt.year),
+        _period_stats(df, 'season', df['datum'].dt.month.map(SEASONS)),
+        _period_stats(df, 'all', pd.Series('all', index=df.index)),
+    ], ignore_index=True)
+    return stats.merge(_trends(df, n_jobs), on=KEY_COLS + ['period_type'], how='left')
+
+
+def _finalize(cube: pd.DataFrame, fp: pd.DataFrame) -> pd.DataFrame:
+    """Attach fingerprints to the 'all' rows, sort and use compact dtypes."""
+    cube = cube.drop(columns=[c for c in fp.columns if c in cube.columns])
+    cube = cube.merge(fp.reset_index().assign(period_type='all'), on=KEY_COLS + ['period_type'], how='left')
+    cube = cube.sort_values(KEY_COLS + ['period_type', 'period'], kind='mergesort').reset_index(drop=True)
+    for c in CATEGORY_COLS:
+        cube[c] = cube[c].astype('category')
+    return cube.astype(INT_COLS)
+
+
+# ---------- Public API ----------
+def build_trend_cube(df: pd.DataFrame, *, param_col: str = 'fewsparametercode', n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Compute the full station x parameter x period cube.
+    n_jobs: worker processes for the trend tests (default: all cores; 1 = run in this process).
+    Period statistics are vectorized groupbys and always run in this process.
+    """
+    d = _coerce_df(df, param_col)
+    return _finalize(_compute(d, n_jobs), _fingerprints(d))
+
+
+def update_trend_cube(
+    cube: pd.DataFrame,
+    df: pd.DataFrame,
+    *,
+    param_col: str = 'fewsparametercode',
+    n_jobs: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Bring an existing cube in line with df (the full, updated dataset).
+    Only series whose fingerprint changed, or that are new, are recomputed;
+    series no longer present in df are dropped.
+    """
+    d = _coerce_df(df, param_col)
+    fp = _fingerprints(d)
+
+    old_fp = cube[cube['period_type'] == 'all'].set_index(KEY_COLS)[list(fp.columns)]
+    old_fp.index = old_fp.index.map(lambda k: (str(k[0]), str(k[1])))
+    old_fp['last_datum'] = pd.to_datetime(old_fp['last_datum'])
+    joined = fp.join(old_fp, rsuffix='_old', how='left')
+    changed = ~(
+        (joined['n_total'] == joined['n_total_old'])
+        & (joined['content_hash'] == joined['content_hash_old'].astype('UInt64'))
+    ).fillna(False)
+    changed_keys = set(joined.index[changed])
+    keep_keys = set(fp.index) - changed_keys
+
+    key_index = pd.MultiIndex.from_arrays([cube['locatiecode'].astype(str), cube['parameter'].astype(str)])
+    kept = cube[key_index.isin(keep_keys)]
+    d_changed = d[pd.MultiIndex.from_arrays([d['locatiecode'], d['parameter']]).isin(changed_keys)]
+    fresh = _compute(d_changed, n_jobs)
+
+    parts = [p.astype({c: 'object' for c in p.select_dtypes('category').columns}) for p in (kept, fresh) if not p.empty]
+    if not parts:
+        return cube.iloc[0:0]
+    return _finalize(pd.concat(parts, ignore_index=True), fp)
+
+
+def save_trend_cube(cube: pd.DataFrame, path: str | Path) -> None:
+    """Store the cube; '.parquet' uses Parquet (needs pyarrow), anything else CSV (e.g. '.csv.gz')."""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        cube.to_parquet(path, index=False)
+    else:
+        cube.to_csv(path, index=False)
+
+
+def load_trend_cube(path: str | Path) -> pd.DataFrame:
+    """Load a cube written by save_trend_cube."""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    cube = pd.read_csv(
+        path,
+        dtype={'locatiecode': str, 'parameter': str, 'period': str, 'content_hash': 'UInt64', **INT_COLS},
+        parse_dates=['last_datum'],
+    )
+    for c in CATEGORY_COLS:
+        cube[c] = cube[c].astype('category')
+    return cube
+
+
+def get_trend(cube: pd.DataFrame, station: str, parameter: str) -> dict:
+    """Trend summary for one series, e.g. get_trend(cube, 'AMS002', 'NH4')['trend']."""
+    row = cube[(cube['locatiecode'] == station) & (cube['parameter'] == parameter) & (cube['period_type'] == 'all')]
+    if row.empty:
+        return {}
+    return row.iloc[0].to_dict()
+
+
+def get_period_stats(cube: pd.DataFrame, station: str, parameter: str, period_type: str = 'year') -> pd.DataFrame:
+    """Per-period statistics for one series ('year' or 'season')."""
+    rows = cube[(cube['locatiecode'] == station) & (cube['parameter'] == parameter) & (cube['period_type'] == period_type)]
+    cols = ['period', 'count', 'mean', 'min', 'max', 'p10', 'p50', 'p90']
+    return rows[cols].reset_index(drop=True)
+
+
+# ---------- Self-check (python trend_statistics.py) ----------
+def _self_check() -> None:
+    dates = pd.to_datetime([f'{y}-{m:02d}-01' for y in range(2008, 2014) for m in (3, 6, 9, 11)])
+    df = pd.DataFrame({
+        'locatiecode': 'AMS002',
+        'fewsparametercode': 'NH4',
+        'datum': dates,
+        'meetwaarde': [float(i % 7) for i in range(len(dates))],
+    })
+    cube = build_trend_cube(df, n_jobs=1)
+
+    def _same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+        cols = ['locatiecode', 'parameter', 'period_type', 'period', 'count', 'mean']
+        a = a[cols].astype({'period': str, 'period_type': str}).sort_values(cols[:4]).reset_index(drop=True)
+        b = b[cols].astype({'period': str, 'period_type': str}).sort_values(cols[:4]).reset_index(drop=True)
+        return a.astype(str).equals(b.astype(str))
+
+    # A 2010 sample re-dated to 2012: count, last date and value sum are unchanged
+    redated = df.copy()
+    redated.loc[redated['datum'] == pd.Timestamp('2010-06-01'), 'datum'] = pd.Timestamp('2012-06-02')
+    assert _same(update_trend_cube(cube, redated, n_jobs=1), build_trend_cube(redated, n_jobs=1))
+    # Two values swapped between dates: the sum is unchanged
+    swapped = df.copy()
+    swapped.loc[[0, 5], 'meetwaarde'] = swapped.loc[[5, 0], 'meetwaarde'].to_numpy()
+    assert _same(update_trend_cube(cube, swapped, n_jobs=1), build_trend_cube(swapped, n_jobs=1))
+    # Integer columns stay integers despite the rows where they are empty
+    assert str(cube['n_years'].dtype) == 'Int32' and str(cube['n_total'].dtype) == 'Int64'
+    print('trend_statistics: ok')
+
+
+if __name__ == '__main__':
+    _self_check()